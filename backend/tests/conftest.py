@@ -1,35 +1,126 @@
 import pytest
-import tempfile
-import shutil
+import pytest_asyncio
 import os
-from unittest.mock import Mock, AsyncMock, patch
+from types import SimpleNamespace
+from unittest.mock import Mock, AsyncMock
 from fastapi.testclient import TestClient
-from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from typing import List, Optional
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import Config
-from rag_system import RAGSystem
 from models import Course, Lesson, CourseChunk
 
 
-@pytest.fixture
-def mock_config():
+# Test app mirroring the API without static file mounting issues. Built once at
+# import so the models' schemas are generated a single time per session.
+class SourceItem(BaseModel):
+    text: str
+    link: Optional[str] = None
+
+
+class QueryRequest(BaseModel):
+    query: str
+    session_id: Optional[str] = None
+
+
+class QueryResponse(BaseModel):
+    answer: str
+    sources: List[SourceItem]
+    session_id: str
+
+
+class CourseStats(BaseModel):
+    total_courses: int
+    course_titles: List[str]
+
+
+def get_rag_system():
+    """RAG system dependency; the test_app fixture overrides it with the mock"""
+    raise RuntimeError("get_rag_system must be overridden by the test_app fixture")
+
+
+_APP = FastAPI(
+    title="Test Course Materials RAG System",
+    default_response_class=ORJSONResponse,
+)
+
+_APP.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@_APP.post("/api/query", response_model=QueryResponse)
+async def query_documents(request: QueryRequest, rag_system=Depends(get_rag_system)):
+    try:
+        session_id = request.session_id
+        if not session_id:
+            session_id = rag_system.session_manager.create_session()
+        
+        answer, sources = await rag_system.query(request.query, session_id)
+        
+        source_items = []
+        if sources:
+            for src in sources:
+                if isinstance(src, dict):
+                    source_items.append(SourceItem(text=src.get('text', ''), link=src.get('link')))
+                else:
+                    source_items.append(SourceItem(text=str(src), link=None))
+        
+        return QueryResponse(
+            answer=answer,
+            sources=source_items,
+            session_id=session_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@_APP.get("/api/courses", response_model=CourseStats)
+async def get_course_stats(rag_system=Depends(get_rag_system)):
+    try:
+        analytics = rag_system.get_course_analytics()
+        return CourseStats(
+            total_courses=analytics["total_courses"],
+            course_titles=analytics["course_titles"]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@_APP.get("/")
+async def root():
+    return {"message": "Course Materials RAG System API"}
+
+
+@pytest.fixture(scope="session")
+def mock_config(tmp_path_factory):
     """Mock configuration for testing"""
+    # Imported lazily so collecting tests that never need it stays cheap
+    from config import Config
+
     config = Config()
     config.anthropic_api_key = "test-key"
     config.chunk_size = 100
     config.chunk_overlap = 20
     config.max_results = 3
-    config.vector_store_path = tempfile.mkdtemp()
+    config.vector_store_path = str(tmp_path_factory.mktemp("vs"))
     return config
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_course():
-    """Sample course data for testing"""
+    """Sample course data for testing (shared; deep-copy before mutating)"""
     return Course(
         title="Test Course",
         instructor="Test Instructor",
@@ -49,9 +140,9 @@ def sample_course():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_course_chunks():
-    """Sample course chunks for testing"""
+    """Sample course chunks for testing (shared; deep-copy before mutating)"""
     return [
         CourseChunk(
             content="This is lesson 1 content about introduction to the topic.",
@@ -68,7 +159,7 @@ def sample_course_chunks():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_vector_store():
     """Mock vector store for testing"""
     mock_store = Mock()
@@ -90,7 +181,7 @@ def mock_vector_store():
     return mock_store
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_ai_generator():
     """Mock AI generator for testing"""
     mock_ai = AsyncMock()
@@ -101,7 +192,7 @@ def mock_ai_generator():
     return mock_ai
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_session_manager():
     """Mock session manager for testing"""
     mock_session = Mock()
@@ -111,117 +202,63 @@ def mock_session_manager():
     return mock_session
 
 
-@pytest.fixture
-def mock_rag_system(mock_config, mock_vector_store, mock_ai_generator, mock_session_manager):
-    """Mock RAG system with all dependencies mocked"""
-    with patch('rag_system.VectorStore') as mock_vs_class, \
-         patch('rag_system.AIGenerator') as mock_ai_class, \
-         patch('rag_system.SessionManager') as mock_sm_class:
-        
-        mock_vs_class.return_value = mock_vector_store
-        mock_ai_class.return_value = mock_ai_generator
-        mock_sm_class.return_value = mock_session_manager
-        
-        rag = RAGSystem(mock_config)
-        rag.vector_store = mock_vector_store
-        rag.ai_generator = mock_ai_generator
-        rag.session_manager = mock_session_manager
-        
-        # Mock the methods that will be called
-        rag.query = AsyncMock()
-        rag.get_course_analytics = Mock()
-        
-        return rag
+@pytest.fixture(scope="session")
+def mock_rag_system(mock_vector_store, mock_ai_generator, mock_session_manager):
+    """Lightweight RAG system stub exposing only what the test app touches"""
+    return SimpleNamespace(
+        vector_store=mock_vector_store,
+        ai_generator=mock_ai_generator,
+        session_manager=mock_session_manager,
+        query=AsyncMock(),
+        get_course_analytics=Mock(),
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_app(mock_rag_system):
-    """Create a test FastAPI app without static file mounting issues"""
-    from fastapi import FastAPI, HTTPException
-    from fastapi.middleware.cors import CORSMiddleware
-    from pydantic import BaseModel
-    from typing import List, Optional
-    
-    app = FastAPI(title="Test Course Materials RAG System")
-    
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-    
-    class SourceItem(BaseModel):
-        text: str
-        link: Optional[str] = None
-
-    class QueryRequest(BaseModel):
-        query: str
-        session_id: Optional[str] = None
-
-    class QueryResponse(BaseModel):
-        answer: str
-        sources: List[SourceItem]
-        session_id: str
-
-    class CourseStats(BaseModel):
-        total_courses: int
-        course_titles: List[str]
-    
-    @app.post("/api/query", response_model=QueryResponse)
-    async def query_documents(request: QueryRequest):
-        try:
-            session_id = request.session_id
-            if not session_id:
-                session_id = mock_rag_system.session_manager.create_session()
-            
-            answer, sources = await mock_rag_system.query(request.query, session_id)
-            
-            source_items = []
-            if sources:
-                for src in sources:
-                    if isinstance(src, dict):
-                        source_items.append(SourceItem(text=src.get('text', ''), link=src.get('link')))
-                    else:
-                        source_items.append(SourceItem(text=str(src), link=None))
-            
-            return QueryResponse(
-                answer=answer,
-                sources=source_items,
-                session_id=session_id
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-
-    @app.get("/api/courses", response_model=CourseStats)
-    async def get_course_stats():
-        try:
-            analytics = mock_rag_system.get_course_analytics()
-            return CourseStats(
-                total_courses=analytics["total_courses"],
-                course_titles=analytics["course_titles"]
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-    
-    @app.get("/")
-    async def root():
-        return {"message": "Course Materials RAG System API"}
-    
-    return app
+    """Test FastAPI app wired to the mock RAG system"""
+    _APP.dependency_overrides[get_rag_system] = lambda: mock_rag_system
+    yield _APP
+    _APP.dependency_overrides.pop(get_rag_system, None)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(test_app):
-    """Test client for FastAPI app"""
-    return TestClient(test_app)
+    """Test client for FastAPI app, shared across the session so the app
+    lifespan runs exactly once"""
+    with TestClient(test_app) as test_client:
+        yield test_client
 
 
-@pytest.fixture
-def temp_docs_dir():
-    """Temporary directory with sample documents"""
-    temp_dir = tempfile.mkdtemp()
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client(test_app):
+    """Async HTTP client calling the app directly over ASGI, avoiding the
+    TestClient thread hop on every request"""
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_rag_system):
+    """Reset shared mock state so session-scoped fixtures stay isolated per test"""
+    mock_rag_system.query.reset_mock(return_value=True, side_effect=True)
+    mock_rag_system.query.return_value = ("Test response", [])
+    mock_rag_system.get_course_analytics.reset_mock(return_value=True, side_effect=True)
+    mock_rag_system.get_course_analytics.return_value = {
+        'total_courses': 0,
+        'course_titles': []
+    }
+    mock_rag_system.session_manager.create_session.reset_mock(
+        return_value=True, side_effect=True
+    )
+    mock_rag_system.session_manager.create_session.return_value = "test-session-123"
+
+
+@pytest.fixture(scope="session")
+def temp_docs_dir(tmp_path_factory):
+    """Temporary directory with sample documents, written once per session"""
+    temp_dir = str(tmp_path_factory.mktemp("docs"))
     
     course1_content = """Course Title: Introduction to Python
 Course Link: https://example.com/python-course
@@ -238,17 +275,7 @@ Variables store data in memory."""
     with open(os.path.join(temp_dir, "course1.txt"), "w") as f:
         f.write(course1_content)
     
-    yield temp_dir
-    
-    shutil.rmtree(temp_dir)
-
-
-@pytest.fixture(autouse=True)
-def cleanup_vector_store(mock_config):
-    """Cleanup vector store directory after each test"""
-    yield
-    if os.path.exists(mock_config.vector_store_path):
-        shutil.rmtree(mock_config.vector_store_path)
+    return temp_dir
 
 
 @pytest.fixture
@@ -1,26 +1,64 @@
 import pytest
-import json
 from fastapi import status
-from unittest.mock import AsyncMock, Mock, patch
 
+_LESSON_SOURCES = [
+    {'text': 'Python basics from lesson 1', 'link': 'https://example.com/lesson1'},
+    {'text': 'Advanced Python concepts', 'link': 'https://example.com/lesson2'}
+]
 
+_LARGE_COURSE_TITLES = tuple(f"Course {i}" for i in range(100))
+
+
+@pytest.mark.asyncio(loop_scope="session")
 class TestQueryEndpoint:
     """Test cases for the /api/query endpoint"""
 
-    def test_query_success(self, client, mock_rag_system):
-        """Test successful query processing"""
-        mock_rag_system.query = AsyncMock(return_value=(
-            "This is a test response about Python programming.",
-            [
-                {'text': 'Python basics from lesson 1', 'link': 'https://example.com/lesson1'},
-                {'text': 'Advanced Python concepts', 'link': 'https://example.com/lesson2'}
-            ]
-        ))
-        
-        response = client.post(
+    @pytest.mark.parametrize(
+        "query_text,mock_return,expected_sources",
+        [
+            pytest.param(
+                "What is Python?",
+                ("This is a test response about Python programming.", _LESSON_SOURCES),
+                _LESSON_SOURCES,
+                id="dict_sources",
+            ),
+            pytest.param(
+                "Test query",
+                ("Response with string sources", ["Source 1", "Source 2"]),
+                [
+                    {'text': 'Source 1', 'link': None},
+                    {'text': 'Source 2', 'link': None}
+                ],
+                id="legacy_string_sources",
+            ),
+            pytest.param(
+                "Test query",
+                ("Response with no sources", None),
+                [],
+                id="no_sources",
+            ),
+            pytest.param("", ("Empty query response", []), [], id="empty_query"),
+            pytest.param(
+                "What is Python? " * 100, ("Long response", []), [], id="long_query"
+            ),
+            pytest.param(
+                "What is Python? 🐍 Café résumé naïve",
+                ("Special char response", []),
+                [],
+                id="special_characters",
+            ),
+        ],
+    )
+    async def test_query_variants(
+        self, async_client, mock_rag_system, query_text, mock_return, expected_sources
+    ):
+        """Test successful query processing across query and source shapes"""
+        mock_rag_system.query.return_value = mock_return
+        
+        response = await async_client.post(
             "/api/query",
             json={
-                "query": "What is Python?",
+                "query": query_text,
                 "session_id": "test-session-123"
             }
         )
@@ -30,21 +68,20 @@ class TestQueryEndpoint:
         assert "answer" in data
         assert "sources" in data
         assert "session_id" in data
-        assert data["answer"] == "This is a test response about Python programming."
-        assert len(data["sources"]) == 2
-        assert data["sources"][0]["text"] == "Python basics from lesson 1"
-        assert data["sources"][0]["link"] == "https://example.com/lesson1"
+        assert data["answer"] == mock_return[0]
+        assert data["sources"] == expected_sources
         assert data["session_id"] == "test-session-123"
+        mock_rag_system.query.assert_awaited_once_with(query_text, "test-session-123")
 
-    def test_query_without_session_id(self, client, mock_rag_system):
+    async def test_query_without_session_id(self, async_client, mock_rag_system):
         """Test query without session_id creates new session"""
         mock_rag_system.session_manager.create_session.return_value = "new-session-456"
-        mock_rag_system.query = AsyncMock(return_value=(
+        mock_rag_system.query.return_value = (
             "Response without session",
             []
-        ))
+        )
         
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"query": "Test query"}
         )
@@ -54,113 +91,31 @@ class TestQueryEndpoint:
         assert data["session_id"] == "new-session-456"
         mock_rag_system.session_manager.create_session.assert_called_once()
 
-    def test_query_with_string_sources(self, client, mock_rag_system):
-        """Test query handling legacy string sources"""
-        mock_rag_system.query = AsyncMock(return_value=(
-            "Response with string sources",
-            ["Source 1", "Source 2"]
-        ))
-        
-        response = client.post(
-            "/api/query",
-            json={"query": "Test query"}
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert len(data["sources"]) == 2
-        assert data["sources"][0]["text"] == "Source 1"
-        assert data["sources"][0]["link"] is None
-        assert data["sources"][1]["text"] == "Source 2"
-        assert data["sources"][1]["link"] is None
-
-    def test_query_with_empty_sources(self, client, mock_rag_system):
-        """Test query with no sources returned"""
-        mock_rag_system.query = AsyncMock(return_value=(
-            "Response with no sources",
-            None
-        ))
-        
-        response = client.post(
-            "/api/query",
-            json={"query": "Test query"}
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert data["sources"] == []
-
-    def test_query_missing_query_field(self, client):
+    async def test_query_missing_query_field(self, async_client):
         """Test query request missing required query field"""
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
             json={"session_id": "test"}
         )
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
-    def test_query_invalid_json(self, client):
+    async def test_query_invalid_json(self, async_client):
         """Test query with invalid JSON"""
-        response = client.post(
+        response = await async_client.post(
             "/api/query",
-            data="invalid json",
+            content="invalid json",
             headers={"content-type": "application/json"}
         )
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
-    def test_query_empty_query_string(self, client, mock_rag_system):
-        """Test query with empty query string"""
-        mock_rag_system.query = AsyncMock(return_value=("Empty query response", []))
-        
-        response = client.post(
-            "/api/query",
-            json={"query": ""}
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-
-    def test_query_rag_system_error(self, client, mock_rag_system):
-        """Test query when RAG system raises an exception"""
-        mock_rag_system.query = AsyncMock(side_effect=Exception("RAG system error"))
-        
-        response = client.post(
-            "/api/query",
-            json={"query": "Test query"}
-        )
-        
-        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-        assert "RAG system error" in response.json()["detail"]
-
-    def test_query_long_text(self, client, mock_rag_system):
-        """Test query with very long text"""
-        long_query = "What is Python? " * 100
-        mock_rag_system.query = AsyncMock(return_value=("Long response", []))
-        
-        response = client.post(
-            "/api/query",
-            json={"query": long_query}
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-
-    def test_query_special_characters(self, client, mock_rag_system):
-        """Test query with special characters"""
-        special_query = "What is Python? 🐍 Café résumé naïve"
-        mock_rag_system.query = AsyncMock(return_value=("Special char response", []))
-        
-        response = client.post(
-            "/api/query",
-            json={"query": special_query}
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestCoursesEndpoint:
     """Test cases for the /api/courses endpoint"""
 
-    def test_get_courses_success(self, client, mock_rag_system):
+    async def test_get_courses_success(self, async_client, mock_rag_system):
         """Test successful course statistics retrieval"""
         mock_analytics = {
             'total_courses': 3,
@@ -168,7 +123,7 @@ class TestCoursesEndpoint:
         }
         mock_rag_system.get_course_analytics.return_value = mock_analytics
         
-        response = client.get("/api/courses")
+        response = await async_client.get("/api/courses")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -180,7 +135,7 @@ class TestCoursesEndpoint:
         assert "Advanced Python" in data["course_titles"]
         assert "Data Science" in data["course_titles"]
 
-    def test_get_courses_empty_result(self, client, mock_rag_system):
+    async def test_get_courses_empty_result(self, async_client, mock_rag_system):
         """Test course statistics when no courses exist"""
         mock_analytics = {
             'total_courses': 0,
@@ -188,38 +143,28 @@ class TestCoursesEndpoint:
         }
         mock_rag_system.get_course_analytics.return_value = mock_analytics
         
-        response = client.get("/api/courses")
+        response = await async_client.get("/api/courses")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data["total_courses"] == 0
         assert data["course_titles"] == []
 
-    def test_get_courses_rag_system_error(self, client, mock_rag_system):
-        """Test courses endpoint when RAG system raises an exception"""
-        mock_rag_system.get_course_analytics.side_effect = Exception("Analytics error")
-        
-        response = client.get("/api/courses")
-        
-        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-        assert "Analytics error" in response.json()["detail"]
-
-    def test_get_courses_method_not_allowed(self, client):
+    async def test_get_courses_method_not_allowed(self, async_client):
         """Test POST method not allowed on courses endpoint"""
-        response = client.post("/api/courses", json={"test": "data"})
+        response = await async_client.post("/api/courses", json={"test": "data"})
         
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
 
-    def test_get_courses_large_dataset(self, client, mock_rag_system):
+    async def test_get_courses_large_dataset(self, async_client, mock_rag_system):
         """Test course statistics with large number of courses"""
-        course_titles = [f"Course {i}" for i in range(100)]
         mock_analytics = {
             'total_courses': 100,
-            'course_titles': course_titles
+            'course_titles': list(_LARGE_COURSE_TITLES)
         }
         mock_rag_system.get_course_analytics.return_value = mock_analytics
         
-        response = client.get("/api/courses")
+        response = await async_client.get("/api/courses")
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
@@ -260,12 +205,14 @@ class TestAPIMiddleware:
             }
         )
         
-        # CORS headers may not be visible in TestClient, so we just check the request succeeds
-        assert response.status_code in [200, 405]
+        assert response.status_code == status.HTTP_200_OK
+        # Credentialed CORS echoes the request origin rather than "*"
+        assert response.headers.get("access-control-allow-origin") == "http://localhost:3000"
+        assert "POST" in response.headers.get("access-control-allow-methods", "")
 
     def test_content_type_json(self, client, mock_rag_system):
         """Test API endpoints accept and return JSON"""
-        mock_rag_system.query = AsyncMock(return_value=("Test", []))
+        mock_rag_system.query.return_value = ("Test", [])
         
         response = client.post(
             "/api/query",
@@ -277,17 +224,18 @@ class TestAPIMiddleware:
         assert response.headers.get("content-type").startswith("application/json")
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestResponseModels:
     """Test API response model validation"""
 
-    def test_query_response_model_validation(self, client, mock_rag_system):
+    async def test_query_response_model_validation(self, async_client, mock_rag_system):
         """Test QueryResponse model validation"""
-        mock_rag_system.query = AsyncMock(return_value=(
+        mock_rag_system.query.return_value = (
             "Test response",
             [{'text': 'Test source', 'link': 'https://example.com'}]
-        ))
+        )
         
-        response = client.post("/api/query", json={"query": "test"})
+        response = await async_client.post("/api/query", json={"query": "test"})
         data = response.json()
         
         required_fields = ["answer", "sources", "session_id"]
@@ -299,14 +247,14 @@ class TestResponseModels:
             assert "text" in data["sources"][0]
             assert "link" in data["sources"][0]
 
-    def test_course_stats_response_model_validation(self, client, mock_rag_system):
+    async def test_course_stats_response_model_validation(self, async_client, mock_rag_system):
         """Test CourseStats model validation"""
         mock_rag_system.get_course_analytics.return_value = {
             'total_courses': 1,
             'course_titles': ['Test Course']
         }
         
-        response = client.get("/api/courses")
+        response = await async_client.get("/api/courses")
         data = response.json()
         
         required_fields = ["total_courses", "course_titles"]
@@ -338,11 +286,31 @@ class TestErrorHandling:
 
     def test_missing_content_type(self, client, mock_rag_system):
         """Test request without content-type header"""
-        mock_rag_system.query = AsyncMock(return_value=("Test", []))
+        mock_rag_system.query.return_value = ("Test", [])
         
         response = client.post(
             "/api/query",
             json={"query": "test"}
         )
         
-        assert response.status_code == status.HTTP_200_OK
\ No newline at end of file
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "endpoint,method,setter,request_kwargs",
+    [
+        ("/api/query", "post", "query", {"json": {"query": "Test query"}}),
+        ("/api/courses", "get", "get_course_analytics", {}),
+    ],
+)
+async def test_rag_system_error(
+    async_client, mock_rag_system, endpoint, method, setter, request_kwargs
+):
+    """Test endpoints return 500 with the error detail when the RAG system raises"""
+    getattr(mock_rag_system, setter).side_effect = Exception("boom")
+    
+    response = await getattr(async_client, method)(endpoint, **request_kwargs)
+    
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert "boom" in response.json()["detail"]